@@ -3,18 +3,24 @@
 
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import partial
+from functools import lru_cache, partial
+from hashlib import blake2b
+from operator import attrgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
-from uuid import uuid4
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
 import firebase_admin
-import pandas as pd
 from firebase_admin import credentials, firestore
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.api_core.exceptions import AlreadyExists
 
 from ..indexers import Indexer
 from . import exceptions
@@ -32,8 +38,36 @@ from .database import (
 
 log = logging.getLogger(__name__)
 
+# Prefer the faster orjson for REST API payloads when it is installed
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 FIRESTORE_BASE_URI = "https://firestore.googleapis.com/v1/projects/{project_id}/databases/(default)/documents"  # noqa: E501
 FIRESTORE_QUERY_ADDITIONS = "{table}?{attachments}&fields=documents(fields%2Cname)"
+FIRESTORE_DOCUMENT_NAME = (
+    "projects/{project_id}/databases/(default)/documents/{table}/{id}"
+)
+
+# Firestore limits
+FIRESTORE_MAX_BATCH_WRITES = 500
+FIRESTORE_MAX_IN_VALUES = 10
+
+# Maximum number of connections to keep open to the REST API
+# Covers the search term queries that are made from a thread pool
+REST_CONNECTION_POOL_SIZE = 40
+
+# Primary key lookup cache
+PK_CACHE_MAX_SIZE = 10000
+PK_CACHE_TTL_SECONDS = 300
+
+# Maximum number of tokenized search queries to keep
+QUERY_TERMS_CACHE_MAX_SIZE = 256
 
 ###############################################################################
 
@@ -47,6 +81,59 @@ class NoCredResponseTypes:
     string: str = "stringValue"
 
 
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _strptime_timestamp(value: str) -> datetime:
+    if "." in value:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ")
+
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+
+@lru_cache(maxsize=QUERY_TERMS_CACHE_MAX_SIZE)
+def _get_query_terms(query: str) -> FrozenSet[str]:
+    # Clean, remove stopwords, stem, and deduplicate the query terms
+    return frozenset(Indexer.clean_text_for_indexing(query).split(" "))
+
+
+def _get_write_time(write_result) -> datetime:
+    # Write results carry protobuf timestamps
+    # Convert to the same datetime type that rows read back carry
+    return DatetimeWithNanoseconds.from_timestamp_pb(write_result.update_time)
+
+
+def _fromisoformat_timestamp(value: str) -> datetime:
+    # Drop the trailing UTC "Z" to return naive UTC datetimes
+    # datetime.fromisoformat is only available from Python 3.7 and before Python 3.11
+    # only accepts three or six fractional second digits
+    try:
+        return datetime.fromisoformat(value.rstrip("Z"))
+    except (AttributeError, ValueError):
+        return _strptime_timestamp(value)
+
+
+# Prefer the C ISO 8601 parser when it is installed
+# REST API timestamps are always UTC so dropping the offset returns naive UTC datetimes
+try:
+    import ciso8601
+
+    _parse_timestamp = ciso8601.parse_datetime_as_naive
+except ImportError:
+    _parse_timestamp = _fromisoformat_timestamp
+
+
+NO_CRED_RESPONSE_CONVERTERS = {
+    NoCredResponseTypes.boolean: _identity,
+    NoCredResponseTypes.double: float,
+    NoCredResponseTypes.dt: _parse_timestamp,
+    NoCredResponseTypes.integer: int,
+    NoCredResponseTypes.null: _identity,
+    NoCredResponseTypes.string: _identity,
+}
+
+
 class CloudFirestoreWhereOperators:
     eq: str = "EQUAL"
     contains: str = "ARRAY_CONTAINS"
@@ -56,7 +143,49 @@ class CloudFirestoreWhereOperators:
     lteq: str = "LESS_THAN_OR_EQUAL"
 
 
+WHERE_OPERATOR_TO_CLOUD_FIRESTORE_WHERE_OPERATOR = {
+    WhereOperators.eq: CloudFirestoreWhereOperators.eq,
+    WhereOperators.contains: CloudFirestoreWhereOperators.contains,
+    WhereOperators.gt: CloudFirestoreWhereOperators.gt,
+    WhereOperators.lt: CloudFirestoreWhereOperators.lt,
+    WhereOperators.gteq: CloudFirestoreWhereOperators.gteq,
+    WhereOperators.lteq: CloudFirestoreWhereOperators.lteq,
+}
+
+# Order matters, bool must be checked before int as bool is a subclass of int
+CLOUD_FIRESTORE_VALUE_TYPES = (
+    (bool, NoCredResponseTypes.boolean),
+    (float, NoCredResponseTypes.double),
+    (datetime, NoCredResponseTypes.dt),
+    (int, NoCredResponseTypes.integer),
+    (str, NoCredResponseTypes.string),
+    (type(None), NoCredResponseTypes.null),
+)
+EXACT_CLOUD_FIRESTORE_VALUE_TYPES = dict(CLOUD_FIRESTORE_VALUE_TYPES)
+
+
 class CloudFirestoreDatabase(Database):
+    # Names of the upload functions for each table
+    _CDP_TABLE_FUNCTION_NAMES = (
+        ("minutes_item_file", "get_or_upload_minutes_item_file"),
+        ("vote", "get_or_upload_vote"),
+        ("person", "get_or_upload_person"),
+        ("run_input", "get_or_upload_run_input"),
+        ("indexed_minutes_item_term", "upload_or_update_indexed_minutes_item_term"),
+        ("minutes_item", "get_or_upload_minutes_item"),
+        ("event_minutes_item", "get_or_upload_event_minutes_item"),
+        ("run", "get_or_upload_run"),
+        ("run_output", "get_or_upload_run_output"),
+        ("transcript", "get_or_upload_transcript"),
+        ("file", "get_or_upload_file"),
+        ("run_input_file", "get_or_upload_run_input_file"),
+        ("algorithm", "get_or_upload_algorithm"),
+        ("indexed_event_term", "upload_or_update_indexed_event_term"),
+        ("event", "get_or_upload_event"),
+        ("body", "get_or_upload_body"),
+        ("run_output_file", "get_or_upload_run_output_file"),
+    )
+
     def _initialize_creds_db(
         self, credentials_path: Union[str, Path], name: Optional[str] = None
     ):
@@ -83,8 +212,27 @@ class CloudFirestoreDatabase(Database):
         project_id: Optional[str] = None,
         credentials_path: Optional[Union[str, Path]] = None,
         name: Optional[str] = None,
+        assume_deterministic_ids: bool = False,
+        pk_cache_max_size: int = PK_CACHE_MAX_SIZE,
+        pk_cache_ttl: float = PK_CACHE_TTL_SECONDS,
         **kwargs,
     ):
+        # Collection references by table name
+        self._collections = {}
+
+        # Recently found or uploaded rows by table and primary keys
+        # Least recently used rows are dropped first and rows expire after the ttl
+        # The lock makes the cache safe to share between threads
+        self._pk_cache = OrderedDict()
+        self._pk_cache_lock = threading.Lock()
+        self._pk_cache_max_size = pk_cache_max_size
+        self._pk_cache_ttl = pk_cache_ttl
+
+        # New rows are always stored with ids determined by their primary keys
+        # Only when every stored row has such an id can uploads skip looking for an
+        # already stored row by its primary keys
+        self._assume_deterministic_ids = assume_deterministic_ids
+
         # With credentials:
         if credentials_path:
             self._initialize_creds_db(credentials_path, name)
@@ -97,66 +245,69 @@ class CloudFirestoreDatabase(Database):
             self._project_id = project_id
             self._db_uri = FIRESTORE_BASE_URI.format(project_id=project_id)
             self._tables = cdp_tables
+
+            # Reuse connections across requests instead of reconnecting for each one
+            self._session = requests.Session()
+            self._session.mount(
+                "https://", HTTPAdapter(pool_maxsize=REST_CONNECTION_POOL_SIZE)
+            )
         else:
             raise exceptions.MissingParameterError(["project_id", "credentials_path"])
 
-        self._cdp_table_to_function_dict = {
-            "minutes_item_file": self.get_or_upload_minutes_item_file,
-            "vote": self.get_or_upload_vote,
-            "person": self.get_or_upload_person,
-            "run_input": self.get_or_upload_run_input,
-            "indexed_minutes_item_term": self.upload_or_update_indexed_minutes_item_term,  # noqa: E501
-            "minutes_item": self.get_or_upload_minutes_item,
-            "event_minutes_item": self.get_or_upload_event_minutes_item,
-            "run": self.get_or_upload_run,
-            "run_output": self.get_or_upload_run_output,
-            "transcript": self.get_or_upload_transcript,
-            "file": self.get_or_upload_file,
-            "run_input_file": self.get_or_upload_run_input_file,
-            "algorithm": self.get_or_upload_algorithm,
-            "indexed_event_term": self.upload_or_update_indexed_event_term,
-            "event": self.get_or_upload_event,
-            "body": self.get_or_upload_body,
-            "run_output_file": self.get_or_upload_run_output_file,
-        }
+        # Per column partially constructed equality WhereConditions for primary keys
+        self._pk_condition_constructors = {}
+
+        # Upload functions by table name, bound on first use
+        self._cdp_table_functions = None
+
+    @property
+    def _cdp_table_to_function_dict(self) -> Dict[str, Callable]:
+        if self._cdp_table_functions is None:
+            self._cdp_table_functions = {
+                table: getattr(self, function_name)
+                for table, function_name in self._CDP_TABLE_FUNCTION_NAMES
+            }
+
+        return self._cdp_table_functions
+
+    def _get_collection(self, table: str):
+        # Reuse the collection reference for each table
+        collection = self._collections.get(table)
+        if collection is None:
+            collection = self._root.collection(table)
+            self._collections[table] = collection
+
+        return collection
 
     @staticmethod
     def _jsonify_firestore_response(fields: Dict) -> Dict:
         formatted = {}
+        # Bind the converter lookup once instead of once per field
+        get_converter = NO_CRED_RESPONSE_CONVERTERS.get
 
         # Cast or parse values from returned
         for k, type_and_value in fields.items():
-            if NoCredResponseTypes.boolean in type_and_value:
-                formatted[k] = type_and_value[NoCredResponseTypes.boolean]
-            elif NoCredResponseTypes.null in type_and_value:
-                formatted[k] = type_and_value[NoCredResponseTypes.null]
-            elif NoCredResponseTypes.string in type_and_value:
-                formatted[k] = type_and_value[NoCredResponseTypes.string]
-            elif NoCredResponseTypes.double in type_and_value:
-                formatted[k] = float(type_and_value[NoCredResponseTypes.double])
-            elif NoCredResponseTypes.integer in type_and_value:
-                formatted[k] = int(type_and_value[NoCredResponseTypes.integer])
-            elif NoCredResponseTypes.dt in type_and_value:
-                if "." in type_and_value[NoCredResponseTypes.dt]:
-                    formatted[k] = datetime.strptime(
-                        type_and_value[NoCredResponseTypes.dt], "%Y-%m-%dT%H:%M:%S.%fZ"
-                    )
-                else:
-                    formatted[k] = datetime.strptime(
-                        type_and_value[NoCredResponseTypes.dt], "%Y-%m-%dT%H:%M:%SZ"
-                    )
-            else:
-                formatted[k] = type_and_value
+            # Each value is a single {type: value} pair
+            if len(type_and_value) == 1:
+                ((value_type, value),) = type_and_value.items()
+                convert = get_converter(value_type)
+                if convert is not None:
+                    formatted[k] = convert(value)
+                    continue
+
+            # Unknown value types are returned as is
+            formatted[k] = type_and_value
 
         return formatted
 
     def _select_row_by_id_with_creds(self, table: str, id: str) -> Dict:
         # Get result
-        result = self._root.collection(table).document(id).get().to_dict()
+        result = self._get_collection(table).document(id).get().to_dict()
 
         # Found, return expansion
         if result:
-            return {f"{table}_id": id, **result}
+            result[f"{table}_id"] = id
+            return result
 
         # Not found, return None
         return None
@@ -166,21 +317,20 @@ class CloudFirestoreDatabase(Database):
         target_uri = f"{self._db_uri}/{table}/{id}"
 
         # Get
-        response = requests.get(target_uri)
+        response = self._session.get(target_uri)
 
         # Raise errors
         response.raise_for_status()
 
         # To json
-        response = response.json()
+        response = _json_loads(response.content)
 
         # Check for error
         if "fields" in response:
             # Format response
-            return {
-                f"{table}_id": id,
-                **self._jsonify_firestore_response(response["fields"]),
-            }
+            result = self._jsonify_firestore_response(response["fields"])
+            result[f"{table}_id"] = id
+            return result
 
         raise KeyError(f"No row with id: {id} exists.")
 
@@ -191,23 +341,19 @@ class CloudFirestoreDatabase(Database):
 
         return self._select_row_by_id_no_creds(table=table, id=id)
 
-    def _select_rows_as_list_with_creds(
+    def _construct_query_with_creds(
         self,
         table: str,
         filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
         order_by: Optional[Union[List, OrderCondition, str, Tuple]] = None,
         limit: Optional[int] = None,
-    ) -> List[Dict]:
+    ):
         # Create base table ref
-        ref = self._root.collection(table)
+        ref = self._get_collection(table)
 
         # Apply filters
-        if filters:
-            for f in filters:
-                # Construct WhereCondition
-                f = self._construct_where_condition(f)
-                # Apply
-                ref = ref.where(f.column_name, f.operator, f.value)
+        for f in self._construct_where_conditions(filters):
+            ref = ref.where(f.column_name, f.operator, f.value)
 
         # Apply order by
         if order_by:
@@ -218,52 +364,153 @@ class CloudFirestoreDatabase(Database):
         if limit:
             ref = ref.limit(limit)
 
+        return ref
+
+    def _select_rows_by_ids_with_creds(
+        self, table: str, ids: List[str]
+    ) -> List[Optional[Dict]]:
+        collection = self._get_collection(table)
+
+        # Get all in a single request
+        id_key = f"{table}_id"
+        found = {}
+        for snapshot in self._root.get_all([collection.document(id) for id in ids]):
+            if snapshot.exists:
+                row = snapshot.to_dict()
+                row[id_key] = snapshot.id
+                found[snapshot.id] = row
+
+        return [found.get(id) for id in ids]
+
+    def _select_rows_by_ids_no_creds(
+        self, table: str, ids: List[str]
+    ) -> List[Optional[Dict]]:
+        id_key = f"{table}_id"
+        found = {}
+        for i in range(0, len(ids), FIRESTORE_MAX_IN_VALUES):
+            document_names = [
+                FIRESTORE_DOCUMENT_NAME.format(
+                    project_id=self._project_id, table=table, id=id
+                )
+                for id in ids[i : i + FIRESTORE_MAX_IN_VALUES]
+            ]
+
+            # Query by document name
+            structured_query = {
+                "from": [{"collectionId": table, "allDescendants": False}],
+                "where": {
+                    "fieldFilter": {
+                        "field": {"fieldPath": "__name__"},
+                        "op": "IN",
+                        "value": {
+                            "arrayValue": {
+                                "values": [
+                                    {"referenceValue": name} for name in document_names
+                                ]
+                            }
+                        },
+                    }
+                },
+                "limit": len(document_names),
+            }
+
+            for row in self._run_query_no_creds(table, structured_query):
+                found[row[id_key]] = row
+
+        return [found.get(id) for id in ids]
+
+    def select_rows_by_ids(self, table: str, ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Get many rows from a table by looking up the values by id in as few requests as
+        possible.
+
+        Parameters
+        ----------
+        table: str
+            The name of the table to retrieve data by id from.
+        ids: List[str]
+            The ids of the rows to retrieve data for.
+
+        Returns
+        -------
+        results: List[Optional[Dict]]
+            The data for each row in the same order as the provided ids. If a row was
+            not found, None is returned in its place.
+        """
+        # Fast return for nothing to request
+        if len(ids) == 0:
+            return []
+
+        # With credentials
+        if self._credentials_path:
+            return self._select_rows_by_ids_with_creds(table=table, ids=ids)
+
+        return self._select_rows_by_ids_no_creds(table=table, ids=ids)
+
+    def _select_rows_as_list_with_creds(
+        self,
+        table: str,
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
+        order_by: Optional[Union[List, OrderCondition, str, Tuple]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        ref = self._construct_query_with_creds(
+            table=table, filters=filters, order_by=order_by, limit=limit
+        )
+
         # Get and expand
-        return [{f"{table}_id": i.id, **i.to_dict()} for i in ref.stream()]
+        id_key = f"{table}_id"
+        rows = []
+        append = rows.append
+        for i in ref.stream():
+            row = i.to_dict()
+            row[id_key] = i.id
+            append(row)
+
+        return rows
 
     @staticmethod
     def _convert_base_where_operator_to_cloud_firestore_where_operator(op: str) -> str:
-        if op == WhereOperators.eq:
-            return CloudFirestoreWhereOperators.eq
-        if op == WhereOperators.contains:
-            return CloudFirestoreWhereOperators.contains
-        if op == WhereOperators.gt:
-            return CloudFirestoreWhereOperators.gt
-        if op == WhereOperators.lt:
-            return CloudFirestoreWhereOperators.lt
-        if op == WhereOperators.gteq:
-            return CloudFirestoreWhereOperators.gteq
-        if op == WhereOperators.lteq:
-            return CloudFirestoreWhereOperators.lteq
-
-        raise ValueError(
-            f"Unsure how to convert where operator: {op}. "
-            f"No mapping exists between base operators and "
-            f"cloud firestore specific operators."
-        )
+        try:
+            return WHERE_OPERATOR_TO_CLOUD_FIRESTORE_WHERE_OPERATOR[op]
+        except KeyError:
+            raise ValueError(
+                f"Unsure how to convert where operator: {op}. "
+                f"No mapping exists between base operators and "
+                f"cloud firestore specific operators."
+            )
 
     @staticmethod
     def _get_cloud_firestore_value_type(
         val: Union[bool, float, datetime, int, str, None]
     ) -> str:
-        if isinstance(val, bool):
-            return NoCredResponseTypes.boolean
-        if isinstance(val, float):
-            return NoCredResponseTypes.double
-        if isinstance(val, datetime):
-            return NoCredResponseTypes.dt
-        if isinstance(val, int):
-            return NoCredResponseTypes.integer
-        if isinstance(val, str):
-            return NoCredResponseTypes.string
-        if val is None:
-            return NoCredResponseTypes.null
+        # Fast return for exact type matches
+        cloud_firestore_value_type = EXACT_CLOUD_FIRESTORE_VALUE_TYPES.get(type(val))
+        if cloud_firestore_value_type is not None:
+            return cloud_firestore_value_type
+
+        # Handle subclasses
+        for value_type, cloud_firestore_value_type in CLOUD_FIRESTORE_VALUE_TYPES:
+            if isinstance(val, value_type):
+                return cloud_firestore_value_type
 
         raise ValueError(
             f"Unsure how to determine cloud firestore type from object: {val} "
             f"(type: {type(val)})"
         )
 
+    @staticmethod
+    def _format_cloud_firestore_value(
+        val: Union[bool, float, datetime, int, str, None]
+    ) -> Dict[str, Union[bool, float, int, str, None]]:
+        value_type = CloudFirestoreDatabase._get_cloud_firestore_value_type(val)
+
+        # Timestamps are sent as UTC RFC 3339 strings
+        if value_type == NoCredResponseTypes.dt:
+            return {value_type: f"{val.isoformat()}Z"}
+
+        return {value_type: val}
+
     def _select_rows_as_list_no_creds(
         self,
         table: str,
@@ -278,15 +525,7 @@ class CloudFirestoreDatabase(Database):
         if filters:
             # Empty list to store constructed filters in
             constructed_filters = []
-            for f in filters:
-                # Construct WhereCondition
-                f = self._construct_where_condition(f)
-
-                # Handle datetimes
-                filter_val = f.value
-                if isinstance(filter_val, datetime):
-                    filter_val = f"{filter_val.isoformat()}Z"
-
+            for f in self._construct_where_conditions(filters):
                 # Add filter to structuredQuery
                 constructed_filters.append(
                     {
@@ -295,11 +534,7 @@ class CloudFirestoreDatabase(Database):
                             "op": self._convert_base_where_operator_to_cloud_firestore_where_operator(  # noqa: E501
                                 f.operator
                             ),
-                            "value": {
-                                self._get_cloud_firestore_value_type(
-                                    f.value
-                                ): filter_val
-                            },
+                            "value": self._format_cloud_firestore_value(f.value),
                         }
                     }
                 )
@@ -326,10 +561,13 @@ class CloudFirestoreDatabase(Database):
         # Format limit
         structuredQuery["limit"] = limit
 
+        return self._run_query_no_creds(table, structuredQuery)
+
+    def _run_query_no_creds(self, table: str, structured_query: Dict) -> List[Dict]:
         # Post
-        response = requests.post(
+        response = self._session.post(
             f"{self._db_uri}:runQuery",
-            data=json.dumps({"structuredQuery": structuredQuery}),
+            data=_json_dumps({"structuredQuery": structured_query}),
         )
 
         # Raise errors
@@ -339,22 +577,24 @@ class CloudFirestoreDatabase(Database):
             raise exceptions.FailedRequestError(response.json())
 
         # To json
-        response = response.json()
+        response = _json_loads(response.content)
 
         # Return formatted
+        id_key = f"{table}_id"
+        rows = []
+        append = rows.append
         try:
-            return [
-                {
-                    f"{table}_id": document["document"]["name"].split("/")[
-                        -1
-                    ],  # Get last item in the uri
-                    **self._jsonify_firestore_response(document["document"]["fields"]),
-                }
-                for document in response
-            ]
+            for document in response:
+                document = document["document"]
+                row = self._jsonify_firestore_response(document["fields"])
+                # Get last item in the uri
+                row[id_key] = document["name"].rpartition("/")[2]
+                append(row)
         except KeyError:
             return []
 
+        return rows
+
     def select_rows_as_list(
         self,
         table: str,
@@ -412,22 +652,69 @@ class CloudFirestoreDatabase(Database):
             )
         )
 
-    def select_rows_as_dataframe(
+    def _construct_pk_conditions(
+        self, pks: List[Union[WhereCondition, List, Tuple]]
+    ) -> List[WhereCondition]:
+        conditions = []
+        for pk in pks:
+            # The get_or_upload functions always provide (column_name, value) tuples
+            # Reuse a constructor bound to the column name instead of dispatching
+            if type(pk) is tuple and len(pk) == 2:
+                column_name, value = pk
+                construct = self._pk_condition_constructors.get(column_name)
+                if construct is None:
+                    construct = partial(WhereCondition, column_name, WhereOperators.eq)
+                    self._pk_condition_constructors[column_name] = construct
+                conditions.append(construct(value))
+            else:
+                conditions.append(self._construct_where_condition(pk))
+
+        return conditions
+
+    def _select_rows_as_columns_with_creds(
         self,
         table: str,
+        fields: List[str],
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
+        order_by: Optional[Union[List, OrderCondition, str, Tuple]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, List[Any]]:
+        ref = self._construct_query_with_creds(
+            table=table, filters=filters, order_by=order_by, limit=limit
+        )
+
+        # Only download the requested fields
+        ref = ref.select(fields)
+
+        # Fill the columns while streaming so full rows are never stored
+        ids = []
+        columns = [[] for _ in fields]
+        for i in ref.stream():
+            ids.append(i.id)
+            row = i.to_dict()
+            for field, column in zip(fields, columns):
+                column.append(row.get(field))
+
+        return {f"{table}_id": ids, **dict(zip(fields, columns))}
+
+    def select_rows_as_columns(
+        self,
+        table: str,
+        fields: List[str],
         filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
         order_by: Optional[Union[OrderCondition, List, Tuple, str]] = None,
         limit: Optional[int] = None,
-        set_id_to_index: bool = False,
-    ) -> pd.DataFrame:
+    ) -> Dict[str, List[Any]]:
         """
-        Get a dataframe of rows from a table optionally using filters (a list of where
-        conditions), ordering, and limit.
+        Get only the requested columns from a table optionally using filters (a list of
+        where conditions), ordering, and limit.
 
         Parameters
         ----------
         table: str
             The name of the table to retrieve data from.
+        fields: List[str]
+            The names of the columns to retrieve.
         filters: Optional[List[Union[WhereCondition, List, Tuple]]]
             A list of filters (where conditions) to add filter down the query.
         order_by: Optional[Union[OrderCondition, List, Tuple, str]]
@@ -436,27 +723,89 @@ class CloudFirestoreDatabase(Database):
             An integer limit to how many rows should be returned that match the query
             provided. Commonly, running queries without credentials will have a default
             limit value.
-        set_id_to_index: bool
-            Boolean value to determine whether or not the unique id values for this
-            data should be used as the index of the dataframe.
 
         Returns
         -------
-        results: pandas.DataFrame
-            The results of the query returned as a pandas DataFrame, where each rwow is
-            a unique row from the table queried. If no rows are found, returns an empty
-            DataFrame.
+        results: Dict[str, List[Any]]
+            The results of the query returned as a dictionary mapping the unique id
+            column and each requested column name to a list of values, where the values
+            at a single list index make up one row. Rows missing a requested column
+            will have None stored at that index. If no rows are found, each list is
+            empty.
         """
-        # Get data
-        data = self.select_rows_as_list(
-            table=table, filters=filters, order_by=order_by, limit=limit
+        # With credentials
+        if self._credentials_path:
+            return self._select_rows_as_columns_with_creds(
+                table=table,
+                fields=fields,
+                filters=filters,
+                order_by=order_by,
+                limit=limit,
+            )
+
+        return self._reshape_list_of_rows_to_columns(
+            self.select_rows_as_list(
+                table=table, filters=filters, order_by=order_by, limit=limit
+            ),
+            table=table,
+            fields=fields,
+        )
+
+    def clear_cache(self):
+        with self._pk_cache_lock:
+            self._pk_cache.clear()
+
+    @staticmethod
+    def _pk_cache_key(table: str, pks: List[WhereCondition]) -> Tuple:
+        # Include value types, 1, 1.0, and True are equal but stored differently
+        return (
+            table,
+            tuple(
+                (pk.column_name, pk.operator, type(pk.value), pk.value)
+                for pk in sorted(pks, key=lambda pk: pk.column_name)
+            ),
         )
 
-        # Format
-        if set_id_to_index:
-            return self._reshape_list_of_rows_to_dataframe(data, table)
+    def _get_cached_rows(self, key: Tuple) -> Optional[List[Dict]]:
+        with self._pk_cache_lock:
+            try:
+                cached = self._pk_cache.get(key)
+            except TypeError:
+                # Unhashable primary key values can't be cached
+                return None
+
+            if cached is None:
+                return None
+
+            # Drop expired
+            expires, rows = cached
+            if expires < time.monotonic():
+                del self._pk_cache[key]
+                return None
+
+            # Mark as most recently used
+            self._pk_cache.move_to_end(key)
+
+        # Return copies so callers can't change the cached rows
+        return [dict(row) for row in rows]
+
+    def _cache_rows(self, key: Tuple, rows: List[Dict]):
+        if self._pk_cache_max_size <= 0:
+            return
+
+        expires = time.monotonic() + self._pk_cache_ttl
+        rows = [dict(row) for row in rows]
+        with self._pk_cache_lock:
+            try:
+                self._pk_cache[key] = (expires, rows)
+            except TypeError:
+                # Unhashable primary key values can't be cached
+                return
 
-        return self._reshape_list_of_rows_to_dataframe(data)
+            # Drop least recently used
+            self._pk_cache.move_to_end(key)
+            while len(self._pk_cache) > self._pk_cache_max_size:
+                self._pk_cache.popitem(last=False)
 
     def _select_rows_with_max_results_expectation(
         self,
@@ -465,8 +814,16 @@ class CloudFirestoreDatabase(Database):
         expected_max_rows: int,
     ):
         # Find matching
-        pks = [self._construct_where_condition(pk) for pk in pks]
-        matching = self.select_rows_as_list(table=table, filters=pks)
+        # Only one more row than expected is needed to break the expectation
+        pks = self._construct_pk_conditions(pks)
+        cache_key = self._pk_cache_key(table, pks)
+        matching = self._get_cached_rows(cache_key)
+        if matching is None:
+            matching = self.select_rows_as_list(
+                table=table, filters=pks, limit=expected_max_rows + 1
+            )
+            if matching:
+                self._cache_rows(cache_key, matching)
 
         # Handle expectation
         if len(matching) > expected_max_rows:
@@ -478,41 +835,294 @@ class CloudFirestoreDatabase(Database):
         else:
             return matching
 
+    @staticmethod
+    def _deterministic_id(table: str, pks: List[WhereCondition]) -> str:
+        # The same table and primary key values always produce the same id
+        key = repr(
+            (
+                table,
+                [
+                    (pk.column_name, pk.operator, pk.value)
+                    for pk in sorted(pks, key=lambda pk: pk.column_name)
+                ],
+            )
+        )
+        return blake2b(key.encode(), digest_size=10).hexdigest()
+
     def _get_or_upload_row(
-        self, table: str, pks: List[Union[WhereCondition, List, Tuple]], values: Dict
+        self,
+        table: str,
+        pks: List[Union[WhereCondition, List, Tuple]],
+        values: Dict,
+        timestamp_key: str = "created",
     ) -> Dict:
         # Reject any upload without credentials
         if self._credentials_path is None:
             raise exceptions.MissingCredentialsError()
 
         # Fast return for already stored
-        found = self._select_rows_with_max_results_expectation(
-            table=table, pks=pks, expected_max_rows=1
-        )
-        # Return or upload
+        pks = self._construct_pk_conditions(pks)
+        cache_key = self._pk_cache_key(table, pks)
+        if self._assume_deterministic_ids:
+            found = self._get_cached_rows(cache_key)
+        else:
+            found = self._select_rows_with_max_results_expectation(
+                table=table, pks=pks, expected_max_rows=1
+            )
         if found:
             return found[0]
-        else:
+
+        # Create id
+        id = self._deterministic_id(table, pks)
+        # Store the row, timestamped by the server
+        # Creation fails if the row was already stored (or stored concurrently)
+        try:
+            write_result = (
+                self._get_collection(table)
+                .document(id)
+                .create({**values, timestamp_key: firestore.SERVER_TIMESTAMP})
+            )
+        except AlreadyExists:
+            row = self._select_row_by_id_with_creds(table=table, id=id)
+            if row:
+                self._cache_rows(cache_key, [row])
+
+            return row
+
+        log.debug(f"Uploaded values: {values} " f"To id: {id} " f"On table: {table}")
+
+        # Return row with the stored timestamp
+        row = {
+            f"{table}_id": id,
+            **values,
+            timestamp_key: _get_write_time(write_result),
+        }
+        self._cache_rows(cache_key, [row])
+        return row
+
+    def _upload_or_update_row(
+        self,
+        table: str,
+        pks: List[Union[WhereCondition, List, Tuple]],
+        values: Dict,
+        timestamp_key: str = "updated",
+    ) -> Dict:
+        # Reject any upload without credentials
+        if self._credentials_path is None:
+            raise exceptions.MissingCredentialsError()
+
+        # Create id
+        pks = self._construct_pk_conditions(pks)
+        id = self._deterministic_id(table, pks)
+
+        # Rows stored before ids were determined by primary keys have random ids
+        # If found, use the already stored id
+        if not self._assume_deterministic_ids:
+            found = self._select_rows_with_max_results_expectation(
+                table=table, pks=pks, expected_max_rows=1
+            )
+            if found:
+                id = found[0][f"{table}_id"]
+
+        # Store the row, timestamped by the server
+        write_result = (
+            self._get_collection(table)
+            .document(id)
+            .set({**values, timestamp_key: firestore.SERVER_TIMESTAMP})
+        )
+
+        # Return the stored row with the stored timestamp
+        # Replace any cached version of the row
+        row = {
+            f"{table}_id": id,
+            **values,
+            timestamp_key: _get_write_time(write_result),
+        }
+        self._cache_rows(self._pk_cache_key(table, pks), [row])
+        return row
+
+    @staticmethod
+    def _commit_batch(batch, rows: List[Dict], timestamp_key: str = "created"):
+        # Write results are returned in the same order the writes were added
+        # Fill in the server timestamps of the stored rows
+        for row, write_result in zip(rows, batch.commit()):
+            row[timestamp_key] = _get_write_time(write_result)
+
+    def _commit_created_rows(
+        self, table: str, batch, batched: List[Tuple[List[WhereCondition], Dict, Dict]]
+    ):
+        try:
+            self._commit_batch(batch, [row for pks, values, row in batched])
+        except AlreadyExists:
+            # Batched writes are atomic so none of the rows were stored
+            # Some row was stored concurrently, get or upload each row individually
+            for pks, values, row in batched:
+                stored = self._get_or_upload_row(table=table, pks=pks, values=values)
+                row.clear()
+                row.update(stored)
+
+    def _select_rows_by_pks(
+        self, table: str, pks_list: List[List[WhereCondition]]
+    ) -> List[Optional[Dict]]:
+        # Single column equality primary keys can be looked up many at a time
+        column_names = {
+            tuple((pk.column_name, pk.operator) for pk in pks) for pks in pks_list
+        }
+        if len(column_names) == 1:
+            column_names = column_names.pop()
+            if len(column_names) == 1 and column_names[0][1] == WhereOperators.eq:
+                found = self._select_rows_by_values(
+                    table=table,
+                    column_name=column_names[0][0],
+                    values=[pks[0].value for pks in pks_list],
+                )
+                if found is not None:
+                    return found
+
+        # Fall back to finding each row individually
+        results = []
+        for pks in pks_list:
+            found = self._select_rows_with_max_results_expectation(
+                table=table, pks=pks, expected_max_rows=1
+            )
+            results.append(found[0] if found else None)
+
+        return results
+
+    def _select_rows_by_values(
+        self, table: str, column_name: str, values: List[Any]
+    ) -> Optional[List[Optional[Dict]]]:
+        # Look up each distinct value only once
+        # Include value types, 1, 1.0, and True are equal but stored differently
+        keys = [(type(value), value) for value in values]
+        try:
+            distinct_values = [value for _, value in dict.fromkeys(keys)]
+        except TypeError:
+            # Unhashable primary key values can't be looked up together
+            return None
+
+        # Find matching in chunks of the maximum "in" query size
+        id_key = f"{table}_id"
+        found = {}
+        for i in range(0, len(distinct_values), FIRESTORE_MAX_IN_VALUES):
+            for row in self.select_rows_as_list(
+                table=table,
+                filters=[
+                    (
+                        column_name,
+                        WhereOperators.contains,
+                        distinct_values[i : i + FIRESTORE_MAX_IN_VALUES],
+                    )
+                ],
+            ):
+                # Handle expectation
+                # Only different stored rows sharing a value break it
+                key = (type(row[column_name]), row[column_name])
+                stored = found.get(key)
+                if stored is not None and stored[id_key] != row[id_key]:
+                    raise exceptions.UniquenessError(
+                        table, [column_name], [stored, row]
+                    )
+                found[key] = row
+
+        return [found.get(key) for key in keys]
+
+    def get_or_upload_rows(
+        self,
+        table: str,
+        rows: List[Tuple[List[Union[WhereCondition, List, Tuple]], Dict]],
+    ) -> List[Dict]:
+        """
+        Get or upload many rows to a single table at once.
+
+        Existing rows are found with as few queries as possible and missing rows are
+        stored using batched writes instead of one write request per row.
+
+        Parameters
+        ----------
+        table: str
+            The name of the table to get or upload the rows to.
+        rows: List[Tuple[List[Union[WhereCondition, List, Tuple]], Dict]]
+            A list of (primary keys, values) pairs, where primary keys are the filters
+            used to find an already stored row and values are the data to store if no
+            row was found. A server side created timestamp is added to every uploaded
+            row.
+
+        Returns
+        -------
+        details: List[Dict]
+            The data that was either uploaded or found for each provided row, in the
+            same order as provided. Rows sharing the same primary key values are only
+            uploaded once.
+        """
+        # Reject any upload without credentials
+        if self._credentials_path is None:
+            raise exceptions.MissingCredentialsError()
+
+        # Fast return for already stored
+        pks_list = [self._construct_pk_conditions(pks) for pks, values in rows]
+        found = self._select_rows_by_pks(table=table, pks_list=pks_list)
+
+        # Upload the remaining rows in batches
+        id_key = f"{table}_id"
+        collection = self._get_collection(table)
+        batch = self._root.batch()
+        batched = []
+        n_uploaded = 0
+        uploaded = {}
+        results = []
+        for pks, (_, values), stored in zip(pks_list, rows, found):
+            if stored:
+                results.append(stored)
+                continue
+
+            # Return the same row for repeated primary keys
+            cache_key = self._pk_cache_key(table, pks)
+            try:
+                if cache_key in uploaded:
+                    results.append(uploaded[cache_key])
+                    continue
+            except TypeError:
+                # Unhashable primary key values can't be deduplicated
+                cache_key = None
+
             # Create id
-            id = str(uuid4())
-            # Store the row
-            self._root.collection(table).document(id).set(values)
-            log.debug(
-                f"Uploaded values: {values} " f"To id: {id} " f"On table: {table}"
+            id = self._deterministic_id(table, pks)
+            # Store the row, timestamped by the server
+            # Creation fails if the row was stored concurrently
+            batch.create(
+                collection.document(id),
+                {**values, "created": firestore.SERVER_TIMESTAMP},
             )
+            row = {id_key: id, **values}
+            batched.append((pks, values, row))
+            n_uploaded += 1
+            if len(batched) == FIRESTORE_MAX_BATCH_WRITES:
+                self._commit_created_rows(table, batch, batched)
+                batch = self._root.batch()
+                batched = []
+
+            if cache_key is not None:
+                uploaded[cache_key] = row
+            results.append(row)
 
-            # Return row
-            return {f"{table}_id": id, **values}
+        # Commit remaining
+        if batched:
+            self._commit_created_rows(table, batch, batched)
+
+        log.debug(f"Uploaded {n_uploaded} rows To table: {table}")
+
+        # Cache found and uploaded rows for later single row lookups
+        for pks, row in zip(pks_list, results):
+            self._cache_rows(self._pk_cache_key(table, pks), [row])
+
+        return results
 
     def get_or_upload_body(self, name: str, description: Optional[str] = None) -> Dict:
         return self._get_or_upload_row(
             table="body",
             pks=[("name", name)],
-            values={
-                "name": name,
-                "description": description,
-                "created": datetime.utcnow(),
-            },
+            values={"name": name, "description": description},
         )
 
     def get_or_upload_minutes_item(
@@ -530,7 +1140,6 @@ class CloudFirestoreDatabase(Database):
                 "matter": matter,
                 "title": title,
                 "legistar_event_item_id": legistar_event_item_id,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -549,7 +1158,6 @@ class CloudFirestoreDatabase(Database):
                 "name": name,
                 "uri": uri,
                 "legistar_matter_attachment_id": legistar_matter_attachment_id,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -586,7 +1194,6 @@ class CloudFirestoreDatabase(Database):
                 "minutes_file_uri": minutes_file_uri,
                 "legistar_event_id": legistar_event_id,
                 "legistar_event_link": legistar_event_link,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -605,7 +1212,6 @@ class CloudFirestoreDatabase(Database):
                 "minutes_item_id": minutes_item_id,
                 "index": index,
                 "decision": decision,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -626,7 +1232,6 @@ class CloudFirestoreDatabase(Database):
                 "phone": phone,
                 "website": website,
                 "legistar_person_id": legistar_person_id,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -648,7 +1253,6 @@ class CloudFirestoreDatabase(Database):
                 "event_minutes_item_id": event_minutes_item_id,
                 "decision": decision,
                 "legistar_event_item_vote_id": legistar_event_item_vote_id,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -660,7 +1264,7 @@ class CloudFirestoreDatabase(Database):
         content_type: Optional[str] = None,
     ) -> Dict:
         if filename is None:
-            filename = uri.split("/")[-1]
+            filename = uri.rpartition("/")[2]
 
         return self._get_or_upload_row(
             table="file",
@@ -670,7 +1274,6 @@ class CloudFirestoreDatabase(Database):
                 "filename": filename,
                 "description": description,
                 "content_type": content_type,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -680,12 +1283,7 @@ class CloudFirestoreDatabase(Database):
         return self._get_or_upload_row(
             table="transcript",
             pks=[("event_id", event_id), ("file_id", file_id)],
-            values={
-                "event_id": event_id,
-                "file_id": file_id,
-                "confidence": confidence,
-                "created": datetime.utcnow(),
-            },
+            values={"event_id": event_id, "file_id": file_id, "confidence": confidence},
         )
 
     def get_or_upload_algorithm(
@@ -703,7 +1301,6 @@ class CloudFirestoreDatabase(Database):
                 "version": version,
                 "description": description,
                 "source": source,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -721,7 +1318,6 @@ class CloudFirestoreDatabase(Database):
                 "algorithm_id": algorithm_id,
                 "begin": begin,
                 "completed": completed,
-                "created": datetime.utcnow(),
             },
         )
 
@@ -729,45 +1325,36 @@ class CloudFirestoreDatabase(Database):
         return self._get_or_upload_row(
             table="run_input",
             pks=[("run_id", run_id), ("dtype", dtype), ("value", value)],
-            values={
-                "run_id": run_id,
-                "dtype": dtype,
-                "value": value,
-                "created": datetime.utcnow(),
-            },
+            values={"run_id": run_id, "dtype": dtype, "value": value},
         )
 
     def get_or_upload_run_input_file(self, run_id: str, file_id: str) -> Dict:
         return self._get_or_upload_row(
             table="run_input_file",
             pks=[("run_id", run_id), ("file_id", file_id)],
-            values={"run_id": run_id, "file_id": file_id, "created": datetime.utcnow()},
+            values={"run_id": run_id, "file_id": file_id},
         )
 
     def get_or_upload_run_output(self, run_id: str, dtype: str, value: Any) -> Dict:
         return self._get_or_upload_row(
             table="run_output",
             pks=[("run_id", run_id), ("dtype", dtype), ("value", value)],
-            values={
-                "run_id": run_id,
-                "dtype": dtype,
-                "value": value,
-                "created": datetime.utcnow(),
-            },
+            values={"run_id": run_id, "dtype": dtype, "value": value},
         )
 
     def get_or_upload_run_output_file(self, run_id: str, file_id: str) -> Dict:
         return self._get_or_upload_row(
             table="run_output_file",
             pks=[("run_id", run_id), ("file_id", file_id)],
-            values={"run_id": run_id, "file_id": file_id, "created": datetime.utcnow()},
+            values={"run_id": run_id, "file_id": file_id},
         )
 
     def get_or_upload_event_topic(self, event_id: str, topic: str) -> Dict:
         return self._get_or_upload_row(
             table="event_topic",
             pks=[("event_id", event_id), ("topic", topic)],
-            values={"event_id": event_id, "topic": topic, "updated": datetime.utcnow()},
+            values={"event_id": event_id, "topic": topic},
+            timestamp_key="updated",
         )
 
     def get_or_upload_event_entity(self, event_id: str, label: str, value: Any) -> Dict:
@@ -779,8 +1366,8 @@ class CloudFirestoreDatabase(Database):
                 "label": label,
                 "value": value,
                 "dtype": self._determine_event_entity_dtype(value),
-                "updated": datetime.utcnow(),
             },
+            timestamp_key="updated",
         )
 
     def get_indexed_event_term(self, term: str, event_id: str) -> Dict:
@@ -798,81 +1385,86 @@ class CloudFirestoreDatabase(Database):
     def upload_or_update_indexed_event_term(
         self, term: str, event_id: str, value: float
     ) -> Dict:
-        # Reject any upload without credentials
-        if self._credentials_path is None:
-            raise exceptions.MissingCredentialsError()
-
-        # Check if index term already exists
-        found = self.get_indexed_event_term(term, event_id)
-
-        # If found, use the already stored id
-        if found:
-            id = found["indexed_event_term_id"]
-        # Else, create a new id
-        else:
-            id = str(uuid4())
-
-        # Create values dictionary
-        values = {
-            "term": term,
-            "event_id": event_id,
-            "value": value,
-            "updated": datetime.utcnow(),
-        }
-
-        # Store the row
-        self._root.collection("indexed_event_term").document(id).set(values)
-
-        # Return the newly created row
-        return {"indexed_event_term_id": id, **values}
+        return self._upload_or_update_row(
+            table="indexed_event_term",
+            pks=[("term", term), ("event_id", event_id)],
+            values={"term": term, "event_id": event_id, "value": value},
+        )
 
-    def _search_for_term(
-        self, term: str, table: str
-    ) -> List[Dict[str, Union[str, float, datetime]]]:
+    def _search_for_terms(
+        self, term_filter: Tuple, table: str, match_on: str
+    ) -> Dict[str, List[Union[str, float]]]:
         """
         Helper function for multithreaded query of terms.
         """
-        return self.select_rows_as_list(table, filters=[("term", term)])
+        return self.select_rows_as_columns(
+            table, fields=["term", "value", match_on], filters=[term_filter]
+        )
 
-    def _search(
-        self, query: str, table: str, match_on: str, data_table: str
-    ) -> List[Match]:
+    def _search_term_results(
+        self, query: str, table: str, match_on: str
+    ) -> Dict[str, List[TermResult]]:
         # Clean and tokenize the query
-        query = Indexer.clean_text_for_indexing(query)
-        query_terms = set(query.split(" "))
+        # Repeated queries reuse the already cleaned terms
+        query_terms = _get_query_terms(query)
+
+        # With credentials, request many terms at once with "in" queries
+        # Without, "in" isn't available and each request is limited in rows returned
+        if self._credentials_path:
+            query_terms = list(query_terms)
+            term_filters = [
+                (
+                    "term",
+                    WhereOperators.contains,
+                    query_terms[i : i + FIRESTORE_MAX_IN_VALUES],
+                )
+                for i in range(0, len(query_terms), FIRESTORE_MAX_IN_VALUES)
+            ]
+        else:
+            term_filters = [("term", term) for term in query_terms]
 
         # First query for the terms
-        search_for_term_from_table = partial(self._search_for_term, table=table)
+        search_for_terms_from_table = partial(
+            self._search_for_terms, table=table, match_on=match_on
+        )
         with ThreadPoolExecutor() as exe:
-            term_results = list(exe.map(search_for_term_from_table, query_terms))
+            term_results = list(exe.map(search_for_terms_from_table, term_filters))
 
         # Combine the term results into table results
         table_results = {}
         for term_result in term_results:
             # Join the results into a main results dictionary where they top level key
             # is the table row id
-            for term_details in term_result:
-                if term_details[match_on] in table_results:
-                    table_results[term_details[match_on]].append(term_details)
+            for unique_id, term, value in zip(
+                term_result[match_on], term_result["term"], term_result["value"]
+            ):
+                term_details = TermResult(term=term, contribution=value)
+                if unique_id in table_results:
+                    table_results[unique_id].append(term_details)
                 else:
-                    table_results[term_details[match_on]] = [term_details]
+                    table_results[unique_id] = [term_details]
+
+        return table_results
+
+    def _search(
+        self, query: str, table: str, match_on: str, data_table: str
+    ) -> List[Match]:
+        table_results = self._search_term_results(query, table=table, match_on=match_on)
+
+        # Get the matching table row data
+        table_data = self.select_rows_by_ids(
+            table=data_table, ids=list(table_results.keys())
+        )
 
         # Clean and format the results
         table_matches = []
-        for unique_id, term_results in table_results.items():
+        for (unique_id, term_results), data in zip(table_results.items(), table_data):
             table_matches.append(
-                Match(
-                    unique_id=unique_id,
-                    terms=[
-                        TermResult(term=t["term"], contribution=t["value"])
-                        for t in term_results
-                    ],
-                    data=self.select_row_by_id(table=data_table, id=unique_id),
-                )
+                Match(unique_id=unique_id, terms=term_results, data=data)
             )
 
         # Sort by relevance
-        table_matches = sorted(table_matches, key=lambda m: m.relevance, reverse=True)
+        table_matches.sort(key=attrgetter("relevance"), reverse=True)
 
         return table_matches
 
@@ -881,6 +1473,14 @@ class CloudFirestoreDatabase(Database):
             query, table="indexed_event_term", match_on="event_id", data_table="event"
         )
 
+    def count_events(self, query: str) -> int:
+        # Only the term results are needed, skip retrieving the event data
+        return len(
+            self._search_term_results(
+                query, table="indexed_event_term", match_on="event_id"
+            )
+        )
+
     def get_indexed_minutes_item_term(self, term: str, minutes_item_id: str) -> Dict:
         # Try find
         found = self._select_rows_with_max_results_expectation(
@@ -896,33 +1496,11 @@ class CloudFirestoreDatabase(Database):
     def upload_or_update_indexed_minutes_item_term(
         self, term: str, minutes_item_id: str, value: float
     ) -> Dict:
-        # Reject any upload without credentials
-        if self._credentials_path is None:
-            raise exceptions.MissingCredentialsError()
-
-        # Check if index term already exists
-        found = self.get_indexed_minutes_item_term(term, minutes_item_id)
-
-        # If found, use the already stored id
-        if found:
-            id = found["indexed_minutes_item_term_id"]
-        # Else, create a new id
-        else:
-            id = str(uuid4())
-
-        # Create values dictionary
-        values = {
-            "term": term,
-            "minutes_item_id": minutes_item_id,
-            "value": value,
-            "updated": datetime.utcnow(),
-        }
-
-        # Store the row
-        self._root.collection("indexed_minutes_item_term").document(id).set(values)
-
-        # Return the newly created row
-        return {"indexed_minutes_item_term_id": id, **values}
+        return self._upload_or_update_row(
+            table="indexed_minutes_item_term",
+            pks=[("term", term), ("minutes_item_id", minutes_item_id)],
+            values={"term": term, "minutes_item_id": minutes_item_id, "value": value},
+        )
 
     def search_minutes_items(self, query: str) -> List[Match]:
         return self._search(
@@ -932,27 +1510,37 @@ class CloudFirestoreDatabase(Database):
             data_table="minutes_item",
         )
 
-    def wipe_table(self, table, batch_size):
-        docs = self._root.collection(table).list_documents(batch_size)
+    def wipe_table(self, table, batch_size=FIRESTORE_MAX_BATCH_WRITES):
+        # A single write batch can hold at most 500 operations
+        batch_size = min(batch_size, FIRESTORE_MAX_BATCH_WRITES)
 
         total_del = 0
-        while docs:
-            deleted_count = 0
-            for doc in docs:
-                doc.delete()
-                deleted_count += 1
-                total_del += 1
-
-            # If there could potentially be more documents in the table
-            if deleted_count >= batch_size:
-                docs = self._root.collection(table).list_documents(batch_size)
-            else:
-                log.info(
-                    "Deleted {} docs from {} table in batches of {} docs".format(
-                        total_del, table, batch_size
-                    )
-                )
-                return
+        deleted_count = 0
+        batch = self._root.batch()
+        for doc in self._get_collection(table).list_documents(page_size=batch_size):
+            batch.delete(doc)
+            deleted_count += 1
+
+            # Commit full batches
+            if deleted_count == batch_size:
+                batch.commit()
+                total_del += deleted_count
+                deleted_count = 0
+                batch = self._root.batch()
+
+        # Commit remaining
+        if deleted_count:
+            batch.commit()
+            total_del += deleted_count
+
+        # Forget cached rows, they may no longer be stored
+        self.clear_cache()
+
+        log.info(
+            "Deleted {} docs from {} table in batches of {} docs".format(
+                total_del, table, batch_size
+            )
+        )
 
     @property
     def tables(self) -> List[str]:
@@ -3,7 +3,8 @@
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import pandas as pd
 
@@ -64,11 +65,16 @@ class TermResult(NamedTuple):
 
 
 class Match:
+    __slots__ = ("_unique_id", "_terms", "_data", "_relevance")
+
     def __init__(self, unique_id, terms: List[TermResult], data: Dict[str, Any]):
         self._unique_id = unique_id
-        self._terms = terms
+        self._terms = tuple(terms)
         self._data = data
 
+        # Terms can't change so relevance is only summed once
+        self._relevance = sum(t.contribution for t in self._terms)
+
     @property
     def unique_id(self):
         return self._unique_id
@@ -83,13 +89,12 @@ class Match:
 
     @property
     def relevance(self):
-        return sum(t.contribution for t in self.terms)
+        return self._relevance
 
     def __str__(self):
-        return f"<Match [unique_id: {self.unique_id}, relevance: {self.relevance}]>"
+        return f"<Match [unique_id: {self._unique_id}, relevance: {self._relevance}]>"
 
-    def __repr__(self):
-        return str(self)
+    __repr__ = __str__
 
 
 ENTITY_DTYPE_MAP = {
@@ -99,6 +104,99 @@ ENTITY_DTYPE_MAP = {
     datetime: "TIMESTAMP",
 }
 
+# Maximum number of constructed conditions to keep
+CONDITION_CACHE_MAX_SIZE = 1024
+
+
+@lru_cache(maxsize=CONDITION_CACHE_MAX_SIZE)
+def _where_condition_from_sequence(
+    filt: Tuple, value_type: Optional[type]
+) -> WhereCondition:
+    # The value type is only used as part of the cache key
+    # Equal values of different types (1, 1.0, and True) must not share a condition
+    # Assume equal
+    if len(filt) == 2:
+        return WhereCondition(filt[0], WhereOperators.eq, filt[1])
+    elif len(filt) == 3:
+        return WhereCondition(*filt)
+    else:
+        raise exceptions.UnstructuredWhereConditionError(filt)
+
+
+@lru_cache(maxsize=CONDITION_CACHE_MAX_SIZE)
+def _order_condition_from_sequence(by: Tuple) -> OrderCondition:
+    # Assume descending
+    if len(by) == 1:
+        return OrderCondition(by[0], OrderOperators.desc)
+    elif len(by) == 2:
+        return OrderCondition(*by)
+    else:
+        raise exceptions.UnstructuredOrderConditionError(by)
+
+
+def _constructed_condition(
+    condition: Union[WhereCondition, OrderCondition]
+) -> Union[WhereCondition, OrderCondition]:
+    return condition
+
+
+def _where_condition_from_list_or_tuple(filt: Union[List, Tuple]) -> WhereCondition:
+    # Reuse conditions constructed from the same filter
+    filt = tuple(filt)
+    value_type = type(filt[-1]) if filt else None
+    try:
+        return _where_condition_from_sequence(filt, value_type)
+    except TypeError:
+        # Filters with unhashable values can't be cached
+        return _where_condition_from_sequence.__wrapped__(filt, value_type)
+
+
+def _order_condition_from_list_or_tuple(by: Union[List, Tuple]) -> OrderCondition:
+    # Reuse conditions constructed from the same order by
+    by = tuple(by)
+    try:
+        return _order_condition_from_sequence(by)
+    except TypeError:
+        # Order bys with unhashable values can't be cached
+        return _order_condition_from_sequence.__wrapped__(by)
+
+
+def _order_condition_from_str(by: str) -> OrderCondition:
+    # Assume descending
+    return _order_condition_from_sequence((by,))
+
+
+# Condition constructors by the type of the provided object
+# Checked in order when the type isn't an exact match (subclasses)
+# Conditions are tuples themselves so they must come before tuple
+WHERE_CONDITION_CONSTRUCTORS = {
+    WhereCondition: _constructed_condition,
+    tuple: _where_condition_from_list_or_tuple,
+    list: _where_condition_from_list_or_tuple,
+}
+ORDER_CONDITION_CONSTRUCTORS = {
+    OrderCondition: _constructed_condition,
+    str: _order_condition_from_str,
+    tuple: _order_condition_from_list_or_tuple,
+    list: _order_condition_from_list_or_tuple,
+}
+
+
+def _get_condition_constructor(
+    constructors: Dict[type, Callable], obj: Any
+) -> Optional[Callable]:
+    # Exact type match
+    constructor = constructors.get(type(obj))
+    if constructor is not None:
+        return constructor
+
+    # Subclass of a supported type
+    for base, constructor in constructors.items():
+        if isinstance(obj, base):
+            return constructor
+
+    return None
+
 
 ###############################################################################
 
@@ -152,19 +250,39 @@ class Database(ABC):
         rather than greater than or equal.
         ```
         """
-        if isinstance(filt, WhereCondition):
-            return filt
-        elif isinstance(filt, (list, tuple)):
-            # Assume equal
-            if len(filt) == 2:
-                return WhereCondition(filt[0], WhereOperators.eq, filt[1])
-            elif len(filt) == 3:
-                return WhereCondition(*filt)
-            else:
-                raise exceptions.UnstructuredWhereConditionError(filt)
-        else:
+        construct = _get_condition_constructor(WHERE_CONDITION_CONSTRUCTORS, filt)
+        if construct is None:
             raise exceptions.UnknownTypeWhereConditionError(filt)
 
+        return construct(filt)
+
+    @staticmethod
+    def _construct_where_conditions(
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]]
+    ) -> List[WhereCondition]:
+        """
+        Construct where conditions for every filter in the passed list of filters.
+
+        Parameters
+        ----------
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]]
+            The filters to construct WhereConditions for.
+
+        Returns
+        -------
+        filters: List[WhereCondition]
+            A WhereCondition for each provided filter, in the same order. If no
+            filters were provided, returns an empty list.
+        """
+        if not filters:
+            return []
+
+        # Fast return for already constructed
+        if all(type(filt) is WhereCondition for filt in filters):
+            return list(filters)
+
+        return [Database._construct_where_condition(filt) for filt in filters]
+
     @staticmethod
     def _construct_orderby_condition(by: Union[OrderCondition, List, Tuple, str]):
         """
@@ -212,22 +330,18 @@ class Database(ABC):
         ascending rather than descending.
         ```
         """
-        if isinstance(by, OrderCondition):
-            return by
-        if isinstance(by, str):
-            # Assume descending
-            return OrderCondition(by, OrderOperators.desc)
-        elif isinstance(by, (list, tuple)):
-            # Assume descending
-            if len(by) == 1:
-                return OrderCondition(by[0], OrderOperators.desc)
-            elif len(by) == 2:
-                return OrderCondition(*by)
-            else:
-                raise exceptions.UnstructuredOrderConditionError(by)
-        else:
+        construct = _get_condition_constructor(ORDER_CONDITION_CONSTRUCTORS, by)
+        if construct is None:
             raise exceptions.UnknownTypeOrderConditionError(by)
 
+        return construct(by)
+
+    def clear_cache(self):
+        """
+        Forget all rows cached by the database. Databases that don't cache rows have
+        nothing to forget.
+        """
+
     @abstractmethod
     def select_row_by_id(self, table: str, id: str) -> Optional[Dict[str, Any]]:
         """
@@ -247,6 +361,28 @@ class Database(ABC):
         """
         return {}
 
+    def select_rows_by_ids(self, table: str, ids: List[str]) -> List[Optional[Dict]]:
+        """
+        Get many rows from a table by looking up the values by id.
+
+        By default this looks up each row individually. Databases that support
+        getting many rows in a single request should override this method.
+
+        Parameters
+        ----------
+        table: str
+            The name of the table to retrieve data by id from.
+        ids: List[str]
+            The ids of the rows to retrieve data for.
+
+        Returns
+        -------
+        results: List[Optional[Dict]]
+            The data for each row in the same order as the provided ids. If a row was
+            not found, None is returned in its place.
+        """
+        return [self.select_row_by_id(table, id) for id in ids]
+
     @abstractmethod
     def select_rows_as_list(
         self,
@@ -281,6 +417,121 @@ class Database(ABC):
         """
         return []
 
+    def select_rows_as_columns(
+        self,
+        table: str,
+        fields: List[str],
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
+        order_by: Optional[Union[OrderCondition, List, Tuple, str]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, List[Any]]:
+        """
+        Get only the requested columns from a table optionally using filters (a list of
+        where conditions), ordering, and limit.
+
+        By default this reshapes the rows from `select_rows_as_list`. Databases that can
+        fill the columns directly should override this method.
+
+        Parameters
+        ----------
+        table: str
+            The name of the table to retrieve data from.
+        fields: List[str]
+            The names of the columns to retrieve.
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]]
+            A list of filters (where conditions) to add filter down the query.
+        order_by: Optional[Union[OrderCondition, List, Tuple, str]]
+            An order by condition to order the results by before returning.
+        limit: Optional[int]
+            An integer limit to how many rows should be returned that match the query
+            provided.
+
+        Returns
+        -------
+        results: Dict[str, List[Any]]
+            The results of the query returned as a dictionary mapping the unique id
+            column and each requested column name to a list of values, where the values
+            at a single list index make up one row. Rows missing a requested column
+            will have None stored at that index. If no rows are found, each list is
+            empty.
+        """
+        return self._reshape_list_of_rows_to_columns(
+            self.select_rows_as_list(
+                table=table, filters=filters, order_by=order_by, limit=limit
+            ),
+            table=table,
+            fields=fields,
+        )
+
+    def select_rows_as_dataframe(
+        self,
+        table: str,
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]] = None,
+        order_by: Optional[Union[OrderCondition, List, Tuple, str]] = None,
+        limit: Optional[int] = None,
+        set_id_to_index: bool = False,
+        fields: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Get a dataframe of rows from a table optionally using filters (a list of where
+        conditions), ordering, and limit.
+
+        By default this is built from `select_rows_as_list`, or from
+        `select_rows_as_columns` when fields are provided.
+
+        Parameters
+        ----------
+        table: str
+            The name of the table to retrieve data from.
+        filters: Optional[List[Union[WhereCondition, List, Tuple]]]
+            A list of filters (where conditions) to add filter down the query.
+        order_by: Optional[Union[OrderCondition, List, Tuple, str]]
+            An order by condition to order the results by before returning.
+        limit: Optional[int]
+            An integer limit to how many rows should be returned that match the query
+            provided. Commonly, running queries without credentials will have a default
+            limit value.
+        set_id_to_index: bool
+            Boolean value to determine whether or not the unique id values for this
+            data should be used as the index of the dataframe.
+        fields: Optional[List[str]]
+            If provided, only these columns (and the unique id column) will be
+            retrieved and the dataframe is built directly from the columns.
+
+        Returns
+        -------
+        results: pandas.DataFrame
+            The results of the query returned as a pandas DataFrame, where each rwow is
+            a unique row from the table queried. If no rows are found, returns an empty
+            DataFrame.
+        """
+        # Build from columns when known to skip finding the columns of every row
+        if fields is not None:
+            formatted = pd.DataFrame(
+                self.select_rows_as_columns(
+                    table=table,
+                    fields=fields,
+                    filters=filters,
+                    order_by=order_by,
+                    limit=limit,
+                )
+            )
+            if set_id_to_index:
+                formatted = formatted.set_index(f"{table}_id")
+
+            return formatted
+
+        # Get data
+        data = self.select_rows_as_list(
+            table=table, filters=filters, order_by=order_by, limit=limit
+        )
+
+        # Format
+        if set_id_to_index:
+            return self._reshape_list_of_rows_to_dataframe(data, table)
+
+        return self._reshape_list_of_rows_to_dataframe(data)
+
     @staticmethod
     def _reshape_list_of_rows_to_dict(
         rows: List[Dict[str, Any]], table: str
@@ -310,6 +561,36 @@ class Database(ABC):
 
         return formatted
 
+    @staticmethod
+    def _reshape_list_of_rows_to_columns(
+        rows: List[Dict[str, Any]], table: str, fields: List[str]
+    ) -> Dict[str, List[Any]]:
+        """
+        Reshape a list of rows to a dictionary of columns.
+
+        Parameters
+        ----------
+        rows: List[Dict[str, Any]]
+            The rows returned from a `select_rows_as_list` call.
+        table: str
+            The name of the table the rows were retrieved from.
+        fields: List[str]
+            The names of the columns to keep.
+
+        Returns
+        -------
+        formatted: Dict[str, List[Any]]
+            A dictionary mapping the unique id column and each requested column name to
+            a list of values, where the values at a single list index make up one row.
+            Rows missing a requested column will have None stored at that index.
+        """
+        id_key = f"{table}_id"
+        formatted = {id_key: [row[id_key] for row in rows]}
+        for field in fields:
+            formatted[field] = [row.get(field) for row in rows]
+
+        return formatted
+
     @staticmethod
     def _reshape_list_of_rows_to_dataframe(
         rows: List[Dict[str, Any]], table: Optional[str] = None
@@ -898,6 +1179,26 @@ class Database(ABC):
         """
         return []
 
+    def count_events(self, query: str) -> int:
+        """
+        Count the events that match a query without returning the matches.
+
+        By default this counts the results of `search_events`. Databases that can count
+        matches without retrieving the event data should override this method.
+
+        Parameters
+        ----------
+        query: str
+            A query string to be used to search for events using the already stored
+            indexed event term table.
+
+        Returns
+        -------
+        count: int
+            The number of events that would be returned by `search_events`.
+        """
+        return len(self.search_events(query))
+
     @abstractmethod
     def get_indexed_minutes_item_term(self, term: str, minutes_item_id: str) -> Dict:
         """
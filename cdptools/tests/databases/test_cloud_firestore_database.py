@@ -1,22 +1,30 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import json
 from datetime import datetime
 from unittest import mock
 
 import pytest
-from cdptools.databases import WhereOperators, exceptions
+from cdptools.databases import WhereCondition, WhereOperators, exceptions
 from cdptools.databases.cloud_firestore_database import (
     CloudFirestoreDatabase,
     CloudFirestoreWhereOperators,
     NoCredResponseTypes,
+    _fromisoformat_timestamp,
+    _get_query_terms,
+    _parse_timestamp,
 )
 from firebase_admin import firestore
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.api_core.exceptions import AlreadyExists
+from google.protobuf.timestamp_pb2 import Timestamp
 
 
 class MockedResponse:
     def __init__(self, json_data):
         self.json_data = json_data
+        self.content = json.dumps(json_data).encode()
 
     def raise_for_status(self):
         return True
@@ -25,20 +33,37 @@ class MockedResponse:
         return self.json_data
 
 
+class MockedSubclassedString(str):
+    pass
+
+
 class MockedDocument:
     def __init__(self, id, json_data):
         self.id = id
         self.json_data = json_data
 
+    @property
+    def exists(self):
+        return len(self.json_data) > 0
+
     def get(self):
         return self
 
     def set(self, values):
         self.json_data = values
+        self.update_time = Timestamp()
+        self.update_time.GetCurrentTime()
         return self
 
+    def create(self, values):
+        if self.exists:
+            raise AlreadyExists(f"Document already exists: {self.id}")
+
+        return self.set(values)
+
     def to_dict(self):
-        return self.json_data
+        # Firestore returns a copy of the document data
+        return dict(self.json_data)
 
 
 class MockedCollection:
@@ -57,6 +82,9 @@ class MockedCollection:
     def limit(self, val):
         return self
 
+    def select(self, field_paths):
+        return self
+
     def order_by(self, col, direction):
         return self
 
@@ -209,15 +237,212 @@ def test_get_or_upload_row(no_creds_db, creds_db, empty_creds_db, pks):
     empty_creds_db._get_or_upload_row("event", pks, EVENT_VALUES)
 
 
+def test_repeated_lookups(empty_creds_db):
+    with mock.patch.object(
+        empty_creds_db, "select_rows_as_list", wraps=empty_creds_db.select_rows_as_list
+    ) as mocked_select:
+        first = empty_creds_db.get_or_upload_body("Council")
+        second = empty_creds_db.get_or_upload_body("Council")
+        assert mocked_select.call_count == 1
+        assert first == second
+
+        # Changing a returned row doesn't change the cached row
+        first["name"] = "changed"
+        assert empty_creds_db.get_or_upload_body("Council")["name"] == "Council"
+
+        # Cleared rows are looked up again
+        empty_creds_db.clear_cache()
+        empty_creds_db.get_or_upload_body("Council")
+        assert mocked_select.call_count == 2
+
+
+def test_get_or_upload_row_already_created(creds_db):
+    # Skip the primary key lookup and rely on the create failing
+    creds_db._assume_deterministic_ids = True
+    pks = [("video_uri", EVENT_VALUES["video_uri"])]
+    with mock.patch.object(
+        creds_db,
+        "_select_row_by_id_with_creds",
+        wraps=creds_db._select_row_by_id_with_creds,
+    ) as mocked_select:
+        row = creds_db._get_or_upload_row("event", pks, EVENT_VALUES)
+        assert row["event_id"] == CloudFirestoreDatabase._deterministic_id(
+            "event", creds_db._construct_pk_conditions(pks)
+        )
+
+        # The row read back is cached
+        assert creds_db._get_or_upload_row("event", pks, EVENT_VALUES) == row
+        assert mocked_select.call_count == 1
+
+
+def test_upload_or_update_row(no_creds_db, creds_db, empty_creds_db):
+    pks = [("video_uri", EVENT_VALUES["video_uri"])]
+
+    with pytest.raises(exceptions.MissingCredentialsError):
+        no_creds_db._upload_or_update_row("event", pks, dict(EVENT_VALUES))
+
+    # Found, update the already stored row
+    row = creds_db._upload_or_update_row("event", pks, dict(EVENT_VALUES))
+    assert row["event_id"] == "0e3bd59c-3f07-452c-83cf-e9eebeb73af2"
+
+    # Not found, store under the deterministic id
+    row = empty_creds_db._upload_or_update_row("event", pks, dict(EVENT_VALUES))
+    assert row["event_id"] == CloudFirestoreDatabase._deterministic_id(
+        "event", empty_creds_db._construct_pk_conditions(pks)
+    )
+
+    # The server timestamp is replaced by the write time on return
+    assert isinstance(row["updated"], DatetimeWithNanoseconds)
+
+
+def test_cdp_table_to_function_dict(creds_db):
+    functions = creds_db._cdp_table_to_function_dict
+    assert functions["event"] == creds_db.get_or_upload_event
+    assert functions["indexed_event_term"] == (
+        creds_db.upload_or_update_indexed_event_term
+    )
+
+    # Bound once per instance
+    assert creds_db._cdp_table_to_function_dict is functions
+
+
+def test_deterministic_id():
+    pks = [
+        WhereCondition("event_id", WhereOperators.eq, "abcd"),
+        WhereCondition("file_id", WhereOperators.eq, "1234"),
+    ]
+    id = CloudFirestoreDatabase._deterministic_id("transcript", pks)
+
+    # Stable and independent of primary key order
+    assert id == CloudFirestoreDatabase._deterministic_id("transcript", pks[::-1])
+    assert len(id) == 20
+
+    # Different tables and values produce different ids
+    assert id != CloudFirestoreDatabase._deterministic_id("event", pks)
+    assert id != CloudFirestoreDatabase._deterministic_id("transcript", pks[:1])
+
+
+def test_get_or_upload_rows(no_creds_db, creds_db, empty_creds_db):
+    video_uri = "http://video.seattle.gov:8080/media/council/gen_062717V.mp4"
+    rows = [
+        ([("video_uri", video_uri)], EVENT_VALUES),
+        ([("video_uri", video_uri)], EVENT_VALUES),
+    ]
+
+    with pytest.raises(exceptions.MissingCredentialsError):
+        no_creds_db.get_or_upload_rows("event", rows)
+
+    # Both found
+    found = creds_db.get_or_upload_rows("event", rows)
+    assert [r["event_id"] for r in found] == [
+        "0e3bd59c-3f07-452c-83cf-e9eebeb73af2",
+        "0e3bd59c-3f07-452c-83cf-e9eebeb73af2",
+    ]
+    creds_db._root.batch.return_value.commit.assert_not_called()
+
+    # Repeated primary keys are only uploaded once
+    created = Timestamp()
+    created.GetCurrentTime()
+    empty_creds_db._root.batch.return_value.commit.return_value = [
+        mock.Mock(update_time=created)
+    ]
+    uploaded = empty_creds_db.get_or_upload_rows("event", rows)
+    assert uploaded[0]["created"] == DatetimeWithNanoseconds.from_timestamp_pb(created)
+    assert uploaded[0]["event_id"] == uploaded[1]["event_id"]
+    assert empty_creds_db._root.batch.return_value.create.call_count == 1
+    empty_creds_db._root.batch.return_value.commit.assert_called_once()
+
+    # Multiple column primary keys
+    empty_creds_db.get_or_upload_rows(
+        "transcript",
+        [([("event_id", "abcd"), ("file_id", "1234")], {"confidence": 0.9})],
+    )
+
+
+def test_get_or_upload_rows_more_than_in_query(creds_db):
+    video_uri = EVENT_VALUES["video_uri"]
+    creds_db._root.batch.return_value.commit.return_value = []
+
+    # The stored row is returned by every "in" query
+    # Repeated values spread across query chunks aren't a uniqueness failure
+    for n_rows in [11, 21]:
+        rows = [([("video_uri", f"other_{i}")], EVENT_VALUES) for i in range(n_rows)]
+        rows[0] = rows[-1] = ([("video_uri", video_uri)], EVENT_VALUES)
+        found = creds_db.get_or_upload_rows("event", rows)
+        assert found[0]["event_id"] == found[-1]["event_id"]
+        assert found[0]["event_id"] == "0e3bd59c-3f07-452c-83cf-e9eebeb73af2"
+
+
+def test_get_or_upload_rows_values(empty_creds_db):
+    empty_creds_db._root.batch.return_value.commit.return_value = []
+
+    # Equal values of different types are separate rows
+    rows = [([("value", v)], {"value": v}) for v in [1, True, 1.0, 1]]
+    uploaded = empty_creds_db.get_or_upload_rows("run_input", rows)
+    assert len({row["run_input_id"] for row in uploaded}) == 3
+    assert uploaded[0] is uploaded[3]
+
+    # Uploaded rows are cached for single row lookups
+    with mock.patch.object(empty_creds_db, "select_rows_as_list") as mocked_select:
+        found = empty_creds_db._select_rows_with_max_results_expectation(
+            "run_input", [("value", True)], 1
+        )
+        mocked_select.assert_not_called()
+        assert found == [uploaded[1]]
+
+    # Unhashable values are looked up individually
+    rows = [([("value", [1, 2])], {"value": [1, 2]})]
+    assert empty_creds_db.get_or_upload_rows("run_input", rows)[0]["value"] == [1, 2]
+
+
+def test_get_or_upload_rows_created_concurrently(empty_creds_db):
+    pks = [("video_uri", EVENT_VALUES["video_uri"])]
+    batch = empty_creds_db._root.batch.return_value
+    batch.commit.side_effect = AlreadyExists("Document already exists")
+
+    # Fall back to getting or uploading each row individually
+    with mock.patch.object(
+        empty_creds_db, "_get_or_upload_row", wraps=empty_creds_db._get_or_upload_row
+    ) as mocked_upload:
+        uploaded = empty_creds_db.get_or_upload_rows("event", [(pks, EVENT_VALUES)])
+        assert mocked_upload.call_count == 1
+
+    assert uploaded[0]["event_id"] == CloudFirestoreDatabase._deterministic_id(
+        "event", empty_creds_db._construct_pk_conditions(pks)
+    )
+    assert isinstance(uploaded[0]["created"], DatetimeWithNanoseconds)
+
+
 def test_cloud_firestore_database_select_row(no_creds_db, creds_db):
     # Mock requests
-    with mock.patch("requests.get") as mocked_request:
+    with mock.patch("requests.Session.get") as mocked_request:
         mocked_request.return_value = MockedResponse(EVENT_ITEM)
         no_creds_db.select_row_by_id("event", "0e3bd59c-3f07-452c-83cf-e9eebeb73af2")
 
     creds_db.select_row_by_id("event", "0e3bd59c-3f07-452c-83cf-e9eebeb73af2")
 
 
+def test_cloud_firestore_database_select_rows_by_ids(no_creds_db, creds_db):
+    ids = ["0e3bd59c-3f07-452c-83cf-e9eebeb73af2", "abcd"]
+
+    # Mock requests
+    with mock.patch("requests.Session.post") as mocked_request:
+        mocked_request.return_value = MockedResponse(EVENT_ITEMS)
+        results = no_creds_db.select_rows_by_ids("event", ids)
+        assert results[0]["event_id"] == ids[0]
+        assert results[1] is None
+
+    creds_db._root.get_all.return_value = [
+        MockedDocument(ids[0], EVENT_VALUES),
+        MockedDocument(ids[1], {}),
+    ]
+    results = creds_db.select_rows_by_ids("event", ids)
+    assert results[0]["event_id"] == ids[0]
+    assert results[1] is None
+
+    assert creds_db.select_rows_by_ids("event", []) == []
+
+
 @pytest.mark.parametrize(
     "filters, order_by, limit",
     [
@@ -279,13 +504,40 @@ def test_cloud_firestore_database_select_rows_as_list(
     no_creds_db, creds_db, filters, order_by, limit
 ):
     # Mock requests
-    with mock.patch("requests.post") as mocked_request:
+    with mock.patch("requests.Session.post") as mocked_request:
         mocked_request.return_value = MockedResponse(EVENT_ITEMS)
         no_creds_db.select_rows_as_list("event", filters, order_by, limit)
 
     creds_db.select_rows_as_list("event", filters, order_by, limit)
 
 
+def test_cloud_firestore_database_select_rows_as_columns(no_creds_db, creds_db):
+    fields = ["video_uri", "not_a_column"]
+    expected = {
+        "event_id": ["0e3bd59c-3f07-452c-83cf-e9eebeb73af2"],
+        "video_uri": ["http://video.seattle.gov:8080/media/council/gen_062717V.mp4"],
+        "not_a_column": [None],
+    }
+
+    # Mock requests
+    with mock.patch("requests.Session.post") as mocked_request:
+        mocked_request.return_value = MockedResponse(EVENT_ITEMS)
+        assert no_creds_db.select_rows_as_columns("event", fields) == expected
+
+    assert creds_db.select_rows_as_columns("event", fields) == expected
+
+
+def test_cloud_firestore_database_select_rows_as_dataframe_fields(creds_db):
+    df = creds_db.select_rows_as_dataframe("event", fields=["video_uri"])
+    assert list(df.columns) == ["event_id", "video_uri"]
+
+    df = creds_db.select_rows_as_dataframe(
+        "event", set_id_to_index=True, fields=["video_uri"]
+    )
+    assert list(df.index) == ["0e3bd59c-3f07-452c-83cf-e9eebeb73af2"]
+    assert list(df.columns) == ["video_uri"]
+
+
 @pytest.mark.parametrize(
     "op, expected",
     [
@@ -318,6 +570,7 @@ def test_convert_base_where_operator_to_cloud_firestore_where_operator(op, expec
         (1, NoCredResponseTypes.integer),
         ("hello world", NoCredResponseTypes.string),
         (None, NoCredResponseTypes.null),
+        (MockedSubclassedString("hello world"), NoCredResponseTypes.string),
         pytest.param(
             ("hello", "world"), None, marks=pytest.mark.raises(exception=ValueError)
         ),
@@ -327,6 +580,67 @@ def test_get_cloud_firestore_value_type(val, expected):
     assert CloudFirestoreDatabase._get_cloud_firestore_value_type(val) == expected
 
 
+@pytest.mark.parametrize(
+    "fields, expected",
+    [
+        (
+            EVENT_ITEM["fields"],
+            {
+                "video_uri": (
+                    "http://video.seattle.gov:8080/media/council/gen_062717V.mp4"
+                ),
+                "created": datetime(2019, 4, 21, 23, 58, 4, 832481),
+                "event_datetime": datetime(2017, 6, 27),
+                "body_id": "6f38a688-2e96-4e33-841c-883738f9f03d",
+                "source_uri": EVENT_VALUES["source_uri"],
+                "test_boolean_value": True,
+                "test_null_value": None,
+                "test_float_value": 12.12,
+                "test_integer_value": 12,
+            },
+        ),
+        (
+            {"unknown": {"mapValue": {"fields": {}}}},
+            {"unknown": {"mapValue": {"fields": {}}}},
+        ),
+        ({}, {}),
+    ],
+)
+def test_jsonify_firestore_response(fields, expected):
+    assert CloudFirestoreDatabase._jsonify_firestore_response(fields) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("2017-06-27T00:00:00Z", datetime(2017, 6, 27)),
+        ("2019-04-21T23:58:04.832Z", datetime(2019, 4, 21, 23, 58, 4, 832000)),
+        ("2019-04-21T23:58:04.8324Z", datetime(2019, 4, 21, 23, 58, 4, 832400)),
+        ("2019-04-21T23:58:04.832481Z", datetime(2019, 4, 21, 23, 58, 4, 832481)),
+        pytest.param(
+            "not a timestamp", None, marks=pytest.mark.raises(exception=ValueError)
+        ),
+    ],
+)
+@pytest.mark.parametrize("parse", [_parse_timestamp, _fromisoformat_timestamp])
+def test_parse_timestamp(parse, value, expected):
+    assert parse(value) == expected
+
+
+@pytest.mark.parametrize(
+    "val, expected",
+    [
+        (True, {NoCredResponseTypes.boolean: True}),
+        (1, {NoCredResponseTypes.integer: 1}),
+        ("hello world", {NoCredResponseTypes.string: "hello world"}),
+        (datetime(2017, 6, 27), {NoCredResponseTypes.dt: "2017-06-27T00:00:00Z"}),
+        (None, {NoCredResponseTypes.null: None}),
+    ],
+)
+def test_format_cloud_firestore_value(val, expected):
+    assert CloudFirestoreDatabase._format_cloud_firestore_value(val) == expected
+
+
 @pytest.mark.parametrize(
     "pks, n_expected",
     [
@@ -355,37 +669,199 @@ def test_cloud_firestore_database_max_expectation(
     no_creds_db, creds_db, pks, n_expected
 ):
     # Mock requests
-    with mock.patch("requests.post") as mocked_request:
+    with mock.patch("requests.Session.post") as mocked_request:
         mocked_request.return_value = MockedResponse(EVENT_ITEMS)
         no_creds_db._select_rows_with_max_results_expectation("event", pks, n_expected)
 
+        # Only one more row than expected is requested
+        query = json.loads(mocked_request.call_args[1]["data"])["structuredQuery"]
+        assert query["limit"] == n_expected + 1
+
     creds_db._select_rows_with_max_results_expectation("event", pks, n_expected)
 
 
+def test_pk_cache(creds_db, empty_creds_db):
+    pks = [("video_uri", EVENT_VALUES["video_uri"])]
+
+    # Found rows are cached
+    with mock.patch.object(
+        creds_db, "select_rows_as_list", wraps=creds_db.select_rows_as_list
+    ) as mocked_select:
+        first = creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        second = creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        assert mocked_select.call_count == 1
+        assert first == second
+
+        # Changing a returned row doesn't change the cache
+        first[0]["video_uri"] = "changed"
+        third = creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        assert third == second
+
+        # Expired rows are found again
+        creds_db._pk_cache_ttl = -1
+        creds_db._pk_cache.clear()
+        creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        assert mocked_select.call_count == 3
+
+    # Uploaded rows are cached
+    row = empty_creds_db._get_or_upload_row("event", pks, EVENT_VALUES)
+    found = empty_creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+    assert found == [row]
+
+    # Equal values of different types are cached separately
+    empty_creds_db._get_or_upload_row("run_input", [("value", 1)], {"value": 1})
+    assert (
+        empty_creds_db._select_rows_with_max_results_expectation(
+            "run_input", [("value", True)], 1
+        )
+        is None
+    )
+
+    # Least recently used rows are dropped
+    empty_creds_db._pk_cache_max_size = 1
+    empty_creds_db._get_or_upload_row("body", [("name", "Council")], {"name": "A"})
+    assert len(empty_creds_db._pk_cache) == 1
+    assert (
+        empty_creds_db._select_rows_with_max_results_expectation("event", pks, 1)
+        is None
+    )
+
+
+@pytest.mark.parametrize(
+    "n_docs, batch_size, n_expected_commits",
+    [(0, 500, 0), (10, 500, 1), (500, 500, 1), (501, 500, 2), (501, 1000, 2)],
+)
+def test_wipe_table(empty_creds_db, n_docs, batch_size, n_expected_commits):
+    collection = mock.Mock()
+    collection.list_documents.return_value = [mock.Mock() for i in range(n_docs)]
+    empty_creds_db._root.collection.return_value = collection
+
+    empty_creds_db.wipe_table("event", batch_size)
+
+    batch = empty_creds_db._root.batch.return_value
+    assert batch.delete.call_count == n_docs
+    assert batch.commit.call_count == n_expected_commits
+
+
+def test_wipe_table_clears_cache(empty_creds_db):
+    collection = MockedCollection([])
+    collection.list_documents = mock.Mock(return_value=[mock.Mock()])
+    empty_creds_db._root.collection.return_value = collection
+
+    with mock.patch.object(
+        empty_creds_db, "select_rows_as_list", wraps=empty_creds_db.select_rows_as_list
+    ) as mocked_select:
+        empty_creds_db.get_or_upload_body("Council")
+        empty_creds_db.get_or_upload_body("Council")
+        assert mocked_select.call_count == 1
+
+        # Wiped rows are looked up and uploaded again
+        empty_creds_db.wipe_table("body")
+        empty_creds_db.get_or_upload_body("Council")
+        assert mocked_select.call_count == 2
+
+
 def test_search_events(no_creds_db):
     # Mock the complex search query
-    with mock.patch("requests.post") as mocked_post:
+    with mock.patch("requests.Session.post") as mocked_post:
+        mocked_post.side_effect = [
+            MockedResponse(INDEXED_EVENT_TERM_ITEMS_HELLO),
+            MockedResponse(INDEXED_EVENT_TERM_ITEMS_WORLD),
+            # Mock the minimal event query that gets attached to the `Match.data`
+            # attributes
+            MockedResponse([{"readTime": "2019-04-21T23:58:04.832481Z"}]),
+        ]
+
+        # Generate results
+        results = no_creds_db.search_events("hello world")
+
+        # Check results
+        # Two events returned
+        assert len(results) == 2
+
+        # Check individual event results
+        # We know the order they should be returned in is highest match to lowest
+        # match order
+        # Check to make sure that is the case
+        assert results[0].unique_id == "event_id_234"
+        assert results[0].relevance == 0.8
+        assert results[1].unique_id == "event_id_123"
+        assert results[1].relevance == 0.2
+
+
+def test_search_events_with_creds(empty_creds_db):
+    empty_creds_db._root.collection.return_value = MockedCollection(
+        [
+            MockedDocument(
+                "a", {"term": "hello", "event_id": "event_id_123", "value": 0.2}
+            ),
+            MockedDocument(
+                "b", {"term": "world", "event_id": "event_id_234", "value": 0.4}
+            ),
+        ]
+    )
+    empty_creds_db._root.get_all.return_value = [
+        MockedDocument("event_id_123", EVENT_VALUES),
+        MockedDocument("event_id_234", EVENT_VALUES),
+    ]
+
+    with mock.patch.object(
+        empty_creds_db,
+        "select_rows_as_columns",
+        wraps=empty_creds_db.select_rows_as_columns,
+    ) as mocked_select:
+        results = empty_creds_db.search_events("hello world")
+
+        # Both terms are requested at once
+        assert mocked_select.call_count == 1
+
+    assert [r.unique_id for r in results] == ["event_id_234", "event_id_123"]
+
+
+def test_get_query_terms():
+    terms = _get_query_terms("Hello, the World hello")
+    assert terms == frozenset(["hello", "world"])
+
+    # Repeated queries are only cleaned once
+    hits = _get_query_terms.cache_info().hits
+    assert _get_query_terms("Hello, the World hello") is terms
+    assert _get_query_terms.cache_info().hits == hits + 1
+
+
+def test_count_events(no_creds_db):
+    with mock.patch("requests.Session.post") as mocked_post:
         mocked_post.side_effect = [
             MockedResponse(INDEXED_EVENT_TERM_ITEMS_HELLO),
             MockedResponse(INDEXED_EVENT_TERM_ITEMS_WORLD),
         ]
 
-        # Mock the minimal event gets that get attached to the `Match.data` attributes
-        with mock.patch("requests.get") as mocked_get:
-            mocked_get.return_value = MockedResponse({"fields": {}})
-
-            # Generate results
-            results = no_creds_db.search_events("hello world")
-
-            # Check results
-            # Two events returned
-            assert len(results) == 2
-
-            # Check individual event results
-            # We know the order they should be returned in is highest match to lowest
-            # match order
-            # Check to make sure that is the case
-            assert results[0].unique_id == "event_id_234"
-            assert results[0].relevance == 0.8
-            assert results[1].unique_id == "event_id_123"
-            assert results[1].relevance == 0.2
+        # The event data isn't requested
+        assert no_creds_db.count_events("hello world") == 2
+        assert mocked_post.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "pks, expected",
+    [
+        (
+            [("name", "Full Council")],
+            [WhereCondition("name", WhereOperators.eq, "Full Council")],
+        ),
+        (
+            [("event_id", "abcd"), ("minutes_item_id", "1234")],
+            [
+                WhereCondition("event_id", WhereOperators.eq, "abcd"),
+                WhereCondition("minutes_item_id", WhereOperators.eq, "1234"),
+            ],
+        ),
+        (
+            [["value", WhereOperators.gt, 1]],
+            [WhereCondition("value", WhereOperators.gt, 1)],
+        ),
+    ],
+)
+def test_construct_pk_conditions(no_creds_db, pks, expected):
+    # Run twice to use both the fresh and the cached constructors
+    assert no_creds_db._construct_pk_conditions(pks) == expected
+    assert no_creds_db._construct_pk_conditions(pks) == expected
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+from unittest import mock
 
 import pandas as pd
 import pytest
@@ -9,8 +10,10 @@ import pytest
 from cdptools.databases import exceptions
 from cdptools.databases.database import (
     Database,
+    Match,
     OrderCondition,
     OrderOperators,
+    TermResult,
     WhereCondition,
     WhereOperators,
 )
@@ -60,6 +63,37 @@ def test_construct_where_condition(filt):
     Database._construct_where_condition(filt)
 
 
+def test_construct_where_condition_cached():
+    # Repeated filters return the same condition
+    assert Database._construct_where_condition(
+        ("event_id", "abcd")
+    ) is Database._construct_where_condition(["event_id", "abcd"])
+
+    # Equal values of different types are kept
+    assert type(Database._construct_where_condition(("value", 1)).value) is int
+    assert type(Database._construct_where_condition(("value", True)).value) is bool
+    assert type(Database._construct_where_condition(("value", 1.0)).value) is float
+
+    # Unhashable values are still constructed
+    condition = Database._construct_where_condition(
+        ("event_id", WhereOperators.contains, ["abcd", "1234"])
+    )
+    assert condition.value == ["abcd", "1234"]
+
+
+def test_construct_where_conditions():
+    constructed = [
+        WhereCondition("event_id", WhereOperators.eq, "abcd"),
+        WhereCondition("body_id", WhereOperators.eq, "1234"),
+    ]
+    assert Database._construct_where_conditions(constructed) == constructed
+    assert (
+        Database._construct_where_conditions([("event_id", "abcd"), constructed[1]])
+        == constructed
+    )
+    assert Database._construct_where_conditions(None) == []
+
+
 @pytest.mark.parametrize(
     "order_by",
     [
@@ -86,6 +120,42 @@ def test_construct_orderby_condition(order_by):
     Database._construct_orderby_condition(order_by)
 
 
+def test_select_rows_by_ids():
+    rows = {"abcd": {"event_id": "abcd"}}
+    db = mock.Mock(Database)
+    db.select_row_by_id.side_effect = lambda table, id: rows.get(id)
+
+    actual = Database.select_rows_by_ids(db, "event", ["abcd", "1234"])
+    assert actual == [{"event_id": "abcd"}, None]
+
+
+def test_select_rows_as_columns():
+    db = mock.Mock(Database)
+    db.select_rows_as_list.return_value = [
+        {"event_id": "abcd", "some_value": 1},
+        {"event_id": "1234", "some_value": 3},
+    ]
+    db._reshape_list_of_rows_to_columns = Database._reshape_list_of_rows_to_columns
+
+    actual = Database.select_rows_as_columns(db, "event", ["some_value"])
+    assert actual == {"event_id": ["abcd", "1234"], "some_value": [1, 3]}
+
+
+def test_select_rows_as_dataframe():
+    db = mock.Mock(Database)
+    db.select_rows_as_columns.return_value = {
+        "event_id": ["abcd", "1234"],
+        "some_value": [1, 3],
+    }
+
+    actual = Database.select_rows_as_dataframe(
+        db, "event", set_id_to_index=True, fields=["some_value"]
+    )
+    expected = pd.DataFrame(db.select_rows_as_columns.return_value)
+    assert actual.equals(expected.set_index("event_id"))
+    db.select_rows_as_list.assert_not_called()
+
+
 @pytest.mark.parametrize(
     "rows, table, expected",
     [
@@ -114,6 +184,43 @@ def test_reshape_list_of_rows_to_dictionary(rows, table, expected):
     assert actual == expected
 
 
+@pytest.mark.parametrize(
+    "rows, table, fields, expected",
+    [
+        (
+            [
+                {"event_id": "abcd", "some_value": 1, "other_value": "a"},
+                {"event_id": "1234", "some_value": 3, "other_value": "b"},
+            ],
+            "event",
+            ["some_value"],
+            {"event_id": ["abcd", "1234"], "some_value": [1, 3]},
+        ),
+        (
+            [{"event_id": "abcd", "some_value": 1}, {"event_id": "1234"}],
+            "event",
+            ["some_value", "missing_value"],
+            {
+                "event_id": ["abcd", "1234"],
+                "some_value": [1, None],
+                "missing_value": [None, None],
+            },
+        ),
+        ([], "event", ["some_value"], {"event_id": [], "some_value": []}),
+        pytest.param(
+            [{"event_id": "abcd", "some_value": 1}],
+            "body",
+            ["some_value"],
+            None,
+            marks=pytest.mark.raises(exception=KeyError),
+        ),
+    ],
+)
+def test_reshape_list_of_rows_to_columns(rows, table, fields, expected):
+    actual = Database._reshape_list_of_rows_to_columns(rows, table, fields)
+    assert actual == expected
+
+
 @pytest.mark.parametrize(
     "rows, table, expected",
     [
@@ -170,3 +277,24 @@ def test_reshape_list_of_rows_to_dataframe(rows, table, expected):
 def test_determine_event_entity_dtype(value, expected):
     actual = Database._determine_event_entity_dtype(value)
     assert actual == expected
+
+
+def test_match_relevance():
+    terms = [TermResult("housing", 0.5), TermResult("council", 0.25)]
+    match = Match("abcd", terms, {"event_id": "abcd"})
+    assert match.relevance == 0.75
+    assert str(match) == repr(match) == "<Match [unique_id: abcd, relevance: 0.75]>"
+
+    # Changing the provided terms doesn't change the match
+    terms.append(TermResult("budget", 1.0))
+    assert match.relevance == 0.75
+    assert len(match.terms) == 2
+
+
+def test_match_slots():
+    match = Match("abcd", [TermResult("housing", 0.5)], {"event_id": "abcd"})
+
+    # Matches don't carry a per instance dictionary
+    assert not hasattr(match, "__dict__")
+    with pytest.raises(AttributeError):
+        match.other = "value"
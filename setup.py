@@ -53,7 +53,7 @@ requirements = [
     "truecase>=0.0.9",
 ]
 
-extra_requirements = ["appdirs>=1.4.3"]
+extra_requirements = ["appdirs>=1.4.3", "ciso8601>=2.1.2", "orjson>=3.4.0"]
 
 seattle_requirements = [
     "cryptography>=2.9.2",